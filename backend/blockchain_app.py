@@ -1,17 +1,41 @@
 import hashlib
 import json
 import time
+import multiprocessing
 import os
-from typing import List, Dict, Set
-
-from fastapi import FastAPI, HTTPException
+import threading
+import uuid
+import zlib
+from glob import glob
+from itertools import islice
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Set, Optional
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from ecdsa import SigningKey, VerifyingKey, SECP256k1
+from ecdsa import VerifyingKey, SECP256k1
 import random
 
+# Ví / ký nằm trong module riêng (không side effect) để worker của process pool import
+from wallet import (
+    generate_wallet,
+    generate_wallets_chunk,
+    sign_chunk,
+    sign_transaction,  # create_sign.py import từ blockchain_app
+    sign_with_public_key,
+)
+
+try:
+    import zstandard  # Tùy chọn: chỉ cần khi export/import với compression=zstd
+except ImportError:
+    zstandard = None
+
 # =========================
 #  CONFIG
 # =========================
@@ -23,6 +47,28 @@ BLOCK_REWARD_MAX = 10
 
 COINBASE_MASTER_ADDRESS = "01a31d45447b0ab14da6843208d8967d3c5ea9ae"
 
+# Batch wallet / sign
+BATCH_MAX_SIZE = 1000
+BATCH_PARALLEL_THRESHOLD = 16  # Dưới ngưỡng này chạy trực tiếp, không qua process pool
+BATCH_WORKERS = os.cpu_count() or 1
+BATCH_MP_START_METHOD = "spawn"
+
+# Pruned-memory mode: chỉ giữ header trong RAM, body (transactions) nằm trên đĩa
+PRUNED_MODE = os.environ.get("BLOCKCHAIN_PRUNED_MODE") == "1"
+BLOCK_CACHE_MAX_BYTES = 8 * 1024 * 1024  # Giới hạn LRU cache theo kích thước body
+TX_LOG_MAX_ENTRIES = 10000  # Pruned mode: chỉ giữ N entry tx_log gần nhất (RAM và file dữ liệu)
+
+# Export / import NDJSON
+CHAIN_COMPRESSIONS = ("none", "gzip", "zstd")
+CHAIN_IMPORT_BATCH_SIZE = 500
+CHAIN_IMPORT_MAX_LINE_BYTES = 8 * 1024 * 1024  # Một block (một dòng NDJSON) không dài hơn
+CHAIN_IMPORT_DECOMPRESS_STEP = 1024 * 1024  # Mỗi lần giải nén ra tối đa bấy nhiêu byte
+# Difficulty tối thiểu của block được import; cố định, không theo /difficulty hiện tại
+CHAIN_IMPORT_MIN_DIFFICULTY = 1
+
+# Số lần add_transactions tính lại số dư ngoài lock khi có ghi khác chen vào
+ADD_TX_SNAPSHOT_RETRIES = 3
+
 
 # =========================
 #  MODELS
@@ -43,6 +89,10 @@ class SignRequest(BaseModel):
 
 class WalletCreateRequest(BaseModel):
     initial_balance: float = 0
+
+class SignBatchRequest(BaseModel):
+    transactions: List[SignRequest]
+    submit: bool = False  # True: đưa luôn các giao dịch đã ký vào mempool
 # =========================
 #  BLOCK
 # =========================
@@ -57,6 +107,19 @@ class Block:
         self.difficulty = difficulty
         self.hash = self.calculate_hash()
 
+    @classmethod
+    def from_dict(cls, data):
+        """Dựng lại block đã lưu, giữ nguyên nonce/hash (không tính lại hash)."""
+        block = cls.__new__(cls)
+        block.index = data["index"]
+        block.timestamp = data["timestamp"]
+        block.transactions = data["transactions"]
+        block.previous_hash = data["previous_hash"]
+        block.nonce = data["nonce"]
+        block.difficulty = data["difficulty"]
+        block.hash = data["hash"]
+        return block
+
     def to_dict(self):
         return {
             "index": self.index,
@@ -94,21 +157,319 @@ class Block:
 
 # File lưu trữ blockchain
 BLOCKCHAIN_DATA_FILE = "blockchain_data.json"
+# File body của block (pruned mode): mỗi dòng là JSON transactions của một block
+BLOCK_BODIES_FILE = "blockchain_bodies.ndjson"
+# Tồn tại khi node đang chạy; chain_transfer.py từ chối ghi/đọc file dữ liệu lúc đó
+NODE_LOCK_FILE = "blockchain_node.lock"
+
+HEADER_FIELDS = ("index", "timestamp", "previous_hash", "nonce", "difficulty", "hash")
+
+
+class BlockStorageError(Exception):
+    """File body không khớp với header đã lưu (thiếu file, bị cắt ngắn)."""
+
+
+class DiskChain:
+    """
+    Chain dạng list nhưng chỉ giữ header trong RAM.
+    Transactions của từng block nằm trong BLOCK_BODIES_FILE, truy cập qua
+    offset index; các block hay dùng được giữ trong LRU cache giới hạn theo byte.
+    Hỗ trợ len(), chain[i] (kể cả index âm), duyệt tuần tự và append().
+    """
+
+    def __init__(self, path=BLOCK_BODIES_FILE, headers=None, reset=False,
+                 cache_max_bytes=BLOCK_CACHE_MAX_BYTES):
+        self.path = path
+        self.headers: List[Dict] = []
+        self.offsets: List[int] = []
+        self.lengths: List[int] = []
+        self.cache_max_bytes = cache_max_bytes
+        self._cache: "OrderedDict[int, Block]" = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_lock = threading.Lock()  # Cache được dùng chung giữa các thread đọc
+
+        if reset:
+            open(path, "wb").close()
+
+        for header in headers or []:
+            header = dict(header)
+            self.offsets.append(header.pop("offset"))
+            self.lengths.append(header.pop("length"))
+            self.headers.append(header)
+
+        if not os.path.exists(path):
+            if self.headers:
+                raise BlockStorageError(f"Block bodies file not found: {path}")
+            open(path, "wb").close()
+        elif self.headers and os.path.getsize(path) < self.offsets[-1] + self.lengths[-1]:
+            raise BlockStorageError(f"Block bodies file is truncated: {path}")
+
+    def __len__(self):
+        return len(self.headers)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError("block index out of range")
+
+        with self._cache_lock:
+            block = self._cache.get(i)
+            if block is not None:
+                self._cache.move_to_end(i)
+                return block
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offsets[i])
+            body = f.read(self.lengths[i])
+        block = self._make_block(i, body)
+        self._cache_put(i, block)
+        return block
+
+    def __iter__(self):
+        return self.iter_range(len(self))
+
+    def iter_range(self, stop):
+        # Đọc tuần tự một lượt, không đẩy block cũ vào cache (tránh làm trôi block nóng)
+        with open(self.path, "rb") as f:
+            for i in range(stop):
+                block = self._cache.get(i)
+                if block is None:
+                    f.seek(self.offsets[i])
+                    block = self._make_block(i, f.read(self.lengths[i]))
+                yield block
+
+    def append(self, block: Block):
+        self.extend([block])
+
+    def extend(self, blocks: List[Block]):
+        # Ghi body của cả batch trong một lần mở file
+        with open(self.path, "ab") as f:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            for block in blocks:
+                body = (json.dumps(block.transactions, ensure_ascii=False) + "\n").encode("utf-8")
+                f.write(body)
+                # headers append sau cùng: len(self) chỉ tăng khi offset/length đã sẵn sàng
+                self.offsets.append(offset)
+                self.lengths.append(len(body))
+                self.headers.append({k: getattr(block, k) for k in HEADER_FIELDS})
+                offset += len(body)
+                self._cache_put(len(self.headers) - 1, block)
+
+    def header_dicts(self, stop=None):
+        stop = len(self) if stop is None else stop
+        return [
+            dict(self.headers[i], offset=self.offsets[i], length=self.lengths[i])
+            for i in range(stop)
+        ]
+
+    def _make_block(self, i, body):
+        return Block.from_dict(dict(self.headers[i], transactions=json.loads(body)))
+
+    def _cache_put(self, i, block):
+        size = self.lengths[i]
+        if size > self.cache_max_bytes:
+            return
+        with self._cache_lock:
+            if i in self._cache:
+                self._cache.move_to_end(i)
+                return
+            self._cache[i] = block
+            self._cache_bytes += size
+            while self._cache_bytes > self.cache_max_bytes:
+                evicted, _ = self._cache.popitem(last=False)
+                self._cache_bytes -= self.lengths[evicted]
+
+
+def new_chain_storage(path=BLOCK_BODIES_FILE):
+    """Chain rỗng: DiskChain ở pruned mode, list thường ở chế độ mặc định."""
+    return DiskChain(path=path, reset=True) if PRUNED_MODE else []
+
+
+def apply_tx_to_balances(balances: Dict[str, float], tx: Dict):
+    # COINBASE và GENESIS không bị trừ balance (tạo token từ không)
+    if tx["sender"] not in ["COINBASE", "GENESIS"]:
+        balances[tx["sender"]] = balances.get(tx["sender"], 0.0) - tx["amount"]
+    else:
+        balances.setdefault(tx["sender"], 0.0)
+    balances[tx["receiver"]] = balances.get(tx["receiver"], 0.0) + tx["amount"]
+
+
+def chain_work(chain) -> int:
+    """Tổng công PoW của chain (16^difficulty mỗi block), chỉ đọc header."""
+    if isinstance(chain, DiskChain):
+        return sum(16 ** header["difficulty"] for header in chain.headers)
+    return sum(16 ** block.difficulty for block in chain)
+
+
+def _tx_key(tx: Dict) -> str:
+    return json.dumps(tx, sort_keys=True)
+
+
+class PrefixView:
+    """
+    View chỉ đọc trên n phần tử đầu của một list chỉ-append (chain, mempool, tx_log).
+    Writer chỉ append hoặc thay cả list mới, nên prefix đã chụp không bao giờ đổi.
+    """
+
+    def __init__(self, items, length=None):
+        self.items = items
+        self.length = len(items) if length is None else length
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.length
+        if i < 0 or i >= self.length:
+            raise IndexError("index out of range")
+        return self.items[i]
+
+    def __iter__(self):
+        if isinstance(self.items, DiskChain):
+            return self.items.iter_range(self.length)
+        return islice(self.items, self.length)
+
+
+class ChainSnapshot:
+    """Trạng thái bất biến của blockchain tại một thời điểm, dùng cho các thao tác đọc."""
+
+    def __init__(self, chain, mempool, tx_log, current_difficulty):
+        self.chain = PrefixView(chain)
+        self.mempool = PrefixView(mempool)
+        self.tx_log = PrefixView(tx_log)
+        self.current_difficulty = current_difficulty
+
+    def _iter_transactions(self):
+        for block in self.chain:
+            yield from block.transactions
+        yield from self.mempool
+
+    # Balance calculation
+    def get_balance(self, address: str) -> float:
+        balances: Dict[str, float] = {}
+        for tx in self._iter_transactions():
+            if address in (tx["sender"], tx["receiver"]):
+                apply_tx_to_balances(balances, tx)
+        return balances.get(address, 0.0)
+
+    def get_balances(self) -> Dict[str, float]:
+        """Số dư của mọi địa chỉ, tính trong một lượt duyệt chain + mempool."""
+        balances: Dict[str, float] = {}
+        for tx in self._iter_transactions():
+            apply_tx_to_balances(balances, tx)
+        return balances
+
+    def to_file_dict(self):
+        chain = self.chain.items
+        if isinstance(chain, DiskChain):
+            data = {
+                "headers": chain.header_dicts(len(self.chain)),
+                "bodies_file": chain.path,
+            }
+        else:
+            data = {"chain": [b.to_dict() for b in self.chain]}
+        data.update({
+            "mempool": list(self.mempool),
+            "tx_log": list(self.tx_log),
+            "current_difficulty": self.current_difficulty
+        })
+        return data
+
+    def is_chain_valid(self):
+        """
+        Kiểm tra tính toàn vẹn của blockchain.
+        Checks hash integrity and previous_hash links.
+        
+        Returns:
+            dict: {
+                "valid": bool,
+                "errors": list of error messages,
+                "invalid_blocks": list of block indices
+            }
+        """
+        errors = []
+        invalid_blocks = []
+        
+        previous_block = None
+        total_blocks = 0
+
+        # Duyệt tuần tự để không cần random access (chain có thể nằm trên đĩa)
+        for i, current_block in enumerate(self.chain):
+            total_blocks += 1
+
+            # Check 1: Verify block hash is correct
+            calculated_hash = current_block.calculate_hash()
+            if current_block.hash != calculated_hash:
+                error_msg = f"Block #{i}: Hash mismatch (stored: {current_block.hash[:16]}..., calculated: {calculated_hash[:16]}...)"
+                errors.append(error_msg)
+                invalid_blocks.append(i)
+            
+            # Check 2: Verify proof-of-work (hash has required difficulty)
+            required_prefix = "0" * current_block.difficulty
+            if not current_block.hash.startswith(required_prefix):
+                error_msg = f"Block #{i}: Invalid proof-of-work (difficulty {current_block.difficulty})"
+                errors.append(error_msg)
+                if i not in invalid_blocks:
+                    invalid_blocks.append(i)
+            
+            # Check 3: Verify previous_hash link (except genesis block)
+            if previous_block is not None:
+                if current_block.previous_hash != previous_block.hash:
+                    error_msg = f"Block #{i}: Previous hash mismatch (expected: {previous_block.hash[:16]}..., got: {current_block.previous_hash[:16]}...)"
+                    errors.append(error_msg)
+                    if i not in invalid_blocks:
+                        invalid_blocks.append(i)
+
+            previous_block = current_block
+        
+        is_valid = len(errors) == 0
+        
+        return {
+            "valid": is_valid,
+            "errors": errors,
+            "invalid_blocks": invalid_blocks,
+            "total_blocks": total_blocks,
+            "message": "Blockchain is valid" if is_valid else f"Blockchain is invalid: {len(errors)} error(s) found"
+        }
+
 
 class Blockchain:
+    """
+    Ghi (thêm giao dịch, mine, import, đổi difficulty) được tuần tự hóa bằng write lock.
+    Đọc dùng snapshot() - không lock, không chờ mine hay ghi file.
+    """
+
     def __init__(self):
         self.chain: List[Block] = []
         self.mempool: List[Dict] = []
         self.tx_log: List[Dict] = []
         self.current_difficulty = INITIAL_DIFFICULTY
+        self.write_lock = threading.RLock()
+        self.import_lock = threading.Lock()  # Mỗi lúc chỉ một ChainImporter
+        self._save_lock = threading.Lock()
         
         # Load dữ liệu từ file nếu tồn tại
         if os.path.exists(BLOCKCHAIN_DATA_FILE):
             self.load_from_file()
         else:
             self.create_genesis_block()
+        self.publish_snapshot()
+
+    def snapshot(self) -> ChainSnapshot:
+        return self._snapshot
+
+    def publish_snapshot(self):
+        # Gọi trong write lock sau mỗi thay đổi; gán reference là atomic
+        self._snapshot = ChainSnapshot(self.chain, self.mempool, self.tx_log, self.current_difficulty)
 
     def create_genesis_block(self):
+        self.chain = new_chain_storage()
+
         genesis_tx = [{
             "sender": "GENESIS",
             "receiver": COINBASE_MASTER_ADDRESS,
@@ -147,35 +508,52 @@ class Blockchain:
         except Exception:
             return False
 
-    # Balance calculation
+    # Balance calculation (đọc từ snapshot hiện tại)
     def get_balance(self, address: str) -> float:
-        balance = 0.0
+        return self.snapshot().get_balance(address)
 
-        for block in self.chain:
-            for tx in block.transactions:
-                # COINBASE và GENESIS không bị trừ balance (tạo token từ không)
-                if tx["sender"] == address and address not in ["COINBASE", "GENESIS"]:
-                    balance -= tx["amount"]
-                if tx["receiver"] == address:
-                    balance += tx["amount"]
-
-        for tx in self.mempool:
-            # COINBASE và GENESIS không bị trừ balance
-            if tx["sender"] == address and address not in ["COINBASE", "GENESIS"]:
-                balance -= tx["amount"]
-            if tx["receiver"] == address:
-                balance += tx["amount"]
-
-        return balance
-
-    def has_sufficient_balance(self, sender, amount):
-        if sender == "COINBASE":
-            return True
-        return self.get_balance(sender) >= amount
+    def get_balances(self) -> Dict[str, float]:
+        return self.snapshot().get_balances()
 
     def add_transaction(self, tx: Dict):
+        return self.add_transactions([tx])[0]
+
+    def add_transactions(self, txs: List[Dict]) -> List[bool]:
+        """
+        Thêm nhiều giao dịch vào mempool, chỉ lưu file một lần cho cả batch.
+        Chữ ký và số dư (duyệt cả chain) được tính trên snapshot trước khi lấy write lock;
+        trong lock chỉ kiểm tra snapshot chưa đổi rồi cập nhật số dư theo từng giao dịch.
+        """
+        signature_ok = [self.verify_transaction_signature(tx) for tx in txs]
+
+        for attempt in range(ADD_TX_SNAPSHOT_RETRIES + 1):
+            snap = self.snapshot()
+            balances = snap.get_balances()
+
+            with self.write_lock:
+                # Mọi thay đổi chain/mempool đều publish snapshot mới trong lock,
+                # nên snapshot còn nguyên nghĩa là số dư vừa tính vẫn đúng
+                if self.snapshot() is not snap:
+                    if attempt < ADD_TX_SNAPSHOT_RETRIES:
+                        continue
+                    # Ghi khác chen vào liên tục: tính lại trong lock để không thử mãi
+                    balances = self.snapshot().get_balances()
+                results = [
+                    self._admit_transaction(tx, ok, balances)
+                    for tx, ok in zip(txs, signature_ok)
+                ]
+                self._trim_tx_log()
+                self.publish_snapshot()
+                break
+
+        if any(results):
+            self.save_to_file()  # Lưu sau khi thêm transaction
+        return results
+
+    def _admit_transaction(self, tx: Dict, signature_ok: bool, balances: Dict[str, float]):
+        # Gọi trong write lock; balances = số dư chain + mempool hiện tại, được cập nhật tại chỗ
         # Sai chữ ký
-        if not self.verify_transaction_signature(tx):
+        if not signature_ok:
             self.tx_log.append({
                 "status": "FAILED",
                 "reason": "Invalid signature",
@@ -185,7 +563,7 @@ class Blockchain:
             return False
 
         # Không đủ balance
-        if not self.has_sufficient_balance(tx["sender"], tx["amount"]):
+        if tx["sender"] != "COINBASE" and balances.get(tx["sender"], 0.0) < tx["amount"]:
             self.tx_log.append({
                 "status": "FAILED",
                 "reason": "Insufficient balance",
@@ -196,6 +574,7 @@ class Blockchain:
 
         # Thành công đưa vào mempool
         self.mempool.append(tx)
+        apply_tx_to_balances(balances, tx)
 
         self.tx_log.append({
             "status": "SUCCESS",
@@ -203,13 +582,71 @@ class Blockchain:
             "tx": tx,
             "timestamp": time.time()
         })
-
-        self.save_to_file()  # Lưu sau khi thêm transaction
         return True
+
+    def reconcile_mempool(self, new_blocks=None):
+        """
+        Gọi trong write lock sau khi import làm chain thay đổi, trước publish_snapshot().
+        Bỏ giao dịch mempool đã nằm trong chain, kiểm tra lại chữ ký + số dư phần còn lại.
+        new_blocks: các block vừa nối thêm; None nghĩa là cả chain đã bị thay.
+        """
+        if not self.mempool:
+            return
+
+        pending_keys = {_tx_key(tx) for tx in self.mempool}
+        included = set()
+        spenders = set()
+        for block in (self.chain if new_blocks is None else new_blocks):
+            for tx in block.transactions:
+                spenders.add(tx["sender"])
+                key = _tx_key(tx)
+                if key in pending_keys:
+                    included.add(key)
+
+        kept = [tx for tx in self.mempool if _tx_key(tx) not in included]
+
+        # Khi chỉ nối thêm block, số dư chỉ giảm với địa chỉ có chi tiêu trong các block đó
+        if new_blocks is None or any(tx["sender"] in spenders for tx in kept):
+            balances = ChainSnapshot(self.chain, [], [], self.current_difficulty).get_balances()
+            checked = []
+            for tx in kept:
+                if tx["sender"] != "COINBASE" and (
+                    not self.verify_transaction_signature(tx)
+                    or balances.get(tx["sender"], 0.0) < tx["amount"]
+                ):
+                    self.tx_log.append({
+                        "status": "FAILED",
+                        "reason": "Dropped from mempool after chain import",
+                        "tx": tx,
+                        "timestamp": time.time()
+                    })
+                    continue
+                apply_tx_to_balances(balances, tx)
+                checked.append(tx)
+            kept = checked
+
+        if len(kept) != len(self.mempool):
+            self.mempool = kept  # List mới: snapshot cũ vẫn giữ mempool cũ
+        self._trim_tx_log()
+
+    def _trim_tx_log(self):
+        # Gọi trong write lock. Ở pruned mode tx_log không được lớn theo lịch sử chain;
+        # thay bằng list mới (không xóa tại chỗ) để snapshot cũ vẫn đọc được
+        if PRUNED_MODE and len(self.tx_log) > TX_LOG_MAX_ENTRIES:
+            self.tx_log = self.tx_log[-TX_LOG_MAX_ENTRIES:]
+
     def last_block(self):
         return self.chain[-1]
 
     def add_block(self, block: Block):
+        with self.write_lock:
+            if not self._append_block(block):
+                return False
+            self.publish_snapshot()
+            return True
+
+    def _append_block(self, block: Block):
+        # Gọi trong write lock; không publish để caller cập nhật mempool trước
         if block.previous_hash != self.last_block().hash:
             return False
         if block.calculate_hash() != block.hash:
@@ -220,7 +657,17 @@ class Blockchain:
         self.chain.append(block)
         return True
 
+    def set_difficulty(self, difficulty: int):
+        with self.write_lock:
+            self.current_difficulty = difficulty
+            self.publish_snapshot()
+
     def mine_pending_transactions(self, miner_address: str):
+        # PoW chạy trên snapshot, không giữ write lock; chỉ lock khi gắn block vào chain.
+        # Trả về None nếu chain đã đổi trong lúc mine (client nên thử lại).
+        snap = self.snapshot()
+        pending = list(snap.mempool)
+
         # Cho phép mine empty block (chỉ có coinbase reward)
         reward = random.randint(BLOCK_REWARD_MIN, BLOCK_REWARD_MAX)
         coinbase_tx = {
@@ -231,36 +678,42 @@ class Blockchain:
             "public_key": "",
         }
 
-        txs = [coinbase_tx] + self.mempool
+        txs = [coinbase_tx] + pending
 
         new_block = Block(
-            index=len(self.chain),
+            index=len(snap.chain),
             timestamp=time.time(),
             transactions=txs,
-            previous_hash=self.last_block().hash,
-            difficulty=self.current_difficulty,
+            previous_hash=snap.chain[-1].hash,
+            difficulty=snap.current_difficulty,
         )
 
         new_block.mine_block()
 
-        if not self.add_block(new_block):
-            return None
+        with self.write_lock:
+            # Chain hoặc mempool đã bị thay (mine/import khác chen vào) thì bỏ block này
+            if self.mempool is not snap.mempool.items or not self._append_block(new_block):
+                return None
+            # Giữ lại các giao dịch vào mempool trong lúc đang mine; block và mempool
+            # mới được publish cùng một snapshot để reader không đếm giao dịch hai lần
+            self.mempool = self.mempool[len(pending):]
+            self.publish_snapshot()
 
-        self.mempool = []
         self.save_to_file()  # Lưu sau khi mine
         return new_block
 
     def save_to_file(self):
-        """Lưu blockchain vào file JSON"""
+        """
+        Lưu snapshot mới nhất vào file JSON (ghi file tạm rồi os.replace).
+        Không giữ write lock nên không chặn ghi/đọc khác trong lúc serialize.
+        """
         try:
-            data = {
-                "chain": [b.to_dict() for b in self.chain],
-                "mempool": self.mempool,
-                "tx_log": self.tx_log,
-                "current_difficulty": self.current_difficulty
-            }
-            with open(BLOCKCHAIN_DATA_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            with self._save_lock:
+                data = self.snapshot().to_file_dict()
+                tmp_path = BLOCKCHAIN_DATA_FILE + ".tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, BLOCKCHAIN_DATA_FILE)
         except Exception as e:
             print(f"Error saving blockchain: {e}")
 
@@ -271,104 +724,434 @@ class Blockchain:
                 data = json.load(f)
             
             # Restore chain
-            for block_data in data.get("chain", []):
-                block = Block(
-                    index=block_data["index"],
-                    timestamp=block_data["timestamp"],
-                    transactions=block_data["transactions"],
-                    previous_hash=block_data["previous_hash"],
-                    difficulty=block_data["difficulty"]
+            if "headers" in data:
+                # File ở định dạng pruned: header + offset, body nằm trong file riêng
+                disk_chain = DiskChain(
+                    path=data.get("bodies_file", BLOCK_BODIES_FILE),
+                    headers=data["headers"],
                 )
-                block.nonce = block_data["nonce"]
-                block.hash = block_data["hash"]
-                self.chain.append(block)
+                self.chain = disk_chain if PRUNED_MODE else list(disk_chain)
+                if PRUNED_MODE:
+                    self._remove_stale_bodies_files(disk_chain.path)
+            else:
+                # Định dạng cũ (full chain); ở pruned mode body được chuyển sang file riêng
+                self.chain = new_chain_storage()
+                for block_data in data.get("chain", []):
+                    self.chain.append(Block.from_dict(block_data))
             
             # Restore mempool và tx_log
             self.mempool = data.get("mempool", [])
             self.tx_log = data.get("tx_log", [])
+            self._trim_tx_log()
             self.current_difficulty = data.get("current_difficulty", INITIAL_DIFFICULTY)
             
             print(f"Loaded blockchain from file: {len(self.chain)} blocks")
+        except BlockStorageError:
+            # Không tạo genesis mới: save kế tiếp sẽ ghi đè header của chain đang lưu
+            raise
         except Exception as e:
             print(f"Error loading blockchain: {e}")
             self.create_genesis_block()
 
     def is_chain_valid(self):
-        """
-        Kiểm tra tính toàn vẹn của blockchain.
-        Checks hash integrity and previous_hash links.
-        
-        Returns:
-            dict: {
-                "valid": bool,
-                "errors": list of error messages,
-                "invalid_blocks": list of block indices
-            }
-        """
-        errors = []
-        invalid_blocks = []
-        
-        for i in range(len(self.chain)):
-            current_block = self.chain[i]
-            
-            # Check 1: Verify block hash is correct
-            calculated_hash = current_block.calculate_hash()
-            if current_block.hash != calculated_hash:
-                error_msg = f"Block #{i}: Hash mismatch (stored: {current_block.hash[:16]}..., calculated: {calculated_hash[:16]}...)"
-                errors.append(error_msg)
-                invalid_blocks.append(i)
-            
-            # Check 2: Verify proof-of-work (hash has required difficulty)
-            required_prefix = "0" * current_block.difficulty
-            if not current_block.hash.startswith(required_prefix):
-                error_msg = f"Block #{i}: Invalid proof-of-work (difficulty {current_block.difficulty})"
-                errors.append(error_msg)
-                if i not in invalid_blocks:
-                    invalid_blocks.append(i)
-            
-            # Check 3: Verify previous_hash link (except genesis block)
-            if i > 0:
-                previous_block = self.chain[i - 1]
-                if current_block.previous_hash != previous_block.hash:
-                    error_msg = f"Block #{i}: Previous hash mismatch (expected: {previous_block.hash[:16]}..., got: {current_block.previous_hash[:16]}...)"
-                    errors.append(error_msg)
-                    if i not in invalid_blocks:
-                        invalid_blocks.append(i)
-        
-        is_valid = len(errors) == 0
-        
-        return {
-            "valid": is_valid,
-            "errors": errors,
-            "invalid_blocks": invalid_blocks,
-            "total_blocks": len(self.chain),
-            "message": "Blockchain is valid" if is_valid else f"Blockchain is invalid: {len(errors)} error(s) found"
-        }
+        return self.snapshot().is_chain_valid()
+
+    @staticmethod
+    def _remove_stale_bodies_files(current_path):
+        # File body của các lần import replace trước; lúc khởi động không còn snapshot nào đọc chúng
+        for path in glob(BLOCK_BODIES_FILE + "*"):
+            if os.path.abspath(path) != os.path.abspath(current_path):
+                os.remove(path)
 
 
 # =========================
-# WALLET
+# WALLET BATCH (PROCESS POOL)
 # =========================
 
-def generate_wallet():
-    sk = SigningKey.generate(curve=SECP256k1)
-    vk = sk.get_verifying_key()
-    private_key = sk.to_string().hex()
-    public_key = vk.to_string().hex()
-    addr = hashlib.sha256(bytes.fromhex(public_key)).hexdigest()[:40]
-    return private_key, public_key, addr
+_batch_pool: Optional[ProcessPoolExecutor] = None
+_batch_pool_lock = threading.Lock()
+
+
+def get_batch_pool() -> ProcessPoolExecutor:
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is None:
+            # spawn trên mọi OS: không fork server đang chạy nhiều thread;
+            # worker chỉ import module wallet (không side effect)
+            _batch_pool = ProcessPoolExecutor(
+                max_workers=BATCH_WORKERS,
+                mp_context=multiprocessing.get_context(BATCH_MP_START_METHOD),
+            )
+        return _batch_pool
+
+
+def shutdown_batch_pool():
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is not None:
+            _batch_pool.shutdown(wait=False, cancel_futures=True)
+            _batch_pool = None
+
 
+def _drop_broken_pool(pool):
+    global _batch_pool
+    with _batch_pool_lock:
+        # Thread khác có thể đã thay pool mới rồi
+        if _batch_pool is pool:
+            _batch_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
 
-def sign_transaction(private_key, sender, receiver, amount):
-    sk = SigningKey.from_string(bytes.fromhex(private_key), curve=SECP256k1)
-    msg = json.dumps({
-        "sender": sender,
-        "receiver": receiver,
-        "amount": amount
-    }, sort_keys=True).encode()
 
-    sig = sk.sign(msg, hashfunc=hashlib.sha256)
-    return sig.hex()
+def _pool_map(fn, chunks):
+    """map() trên process pool; worker chết thì bỏ pool hỏng, tạo pool mới và chạy lại một lần."""
+    pool = get_batch_pool()
+    try:
+        return list(pool.map(fn, chunks))
+    except BrokenProcessPool:
+        _drop_broken_pool(pool)
+        return list(get_batch_pool().map(fn, chunks))
+
+
+def _split_chunks(items, n_chunks):
+    size = -(-len(items) // n_chunks)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def generate_wallets(count):
+    """Tạo nhiều ví, chia việc cho process pool khi batch đủ lớn."""
+    if count < BATCH_PARALLEL_THRESHOLD or BATCH_WORKERS <= 1:
+        return generate_wallets_chunk(count)
+    n_chunks = min(BATCH_WORKERS, count)
+    counts = [count // n_chunks + (1 if i < count % n_chunks else 0) for i in range(n_chunks)]
+    wallets = []
+    for chunk in _pool_map(generate_wallets_chunk, counts):
+        wallets.extend(chunk)
+    return wallets
+
+
+def sign_transactions(items):
+    """Ký nhiều giao dịch, gom theo private key để mỗi worker tái sử dụng SigningKey."""
+    if len(items) < BATCH_PARALLEL_THRESHOLD or BATCH_WORKERS <= 1:
+        return sign_chunk(items)
+    # Sắp xếp theo private key để các giao dịch cùng ví rơi vào cùng một chunk
+    order = sorted(range(len(items)), key=lambda i: items[i][0])
+    chunks = _split_chunks([items[i] for i in order], min(BATCH_WORKERS, len(items)))
+    signed = []
+    for chunk in _pool_map(sign_chunk, chunks):
+        signed.extend(chunk)
+    results = [None] * len(items)
+    for pos, i in enumerate(order):
+        results[i] = signed[pos]
+    return results
+
+
+# =========================
+# CHAIN EXPORT / IMPORT
+# =========================
+
+class _Passthrough:
+    def compress(self, data):
+        return data
+
+    def flush(self):
+        return b""
+
+
+def make_compressor(compression):
+    if compression == "gzip":
+        return zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ValueError("zstd compression requires the 'zstandard' package")
+        return zstandard.ZstdCompressor().compressobj()
+    if compression == "none":
+        return _Passthrough()
+    raise ValueError(f"Unknown compression: {compression}")
+
+
+def iter_chain_ndjson(chain, compression="none"):
+    """Sinh dữ liệu export: mỗi block một dòng JSON, nén theo từng block."""
+    compressor = make_compressor(compression)
+    for block in chain:
+        data = compressor.compress(
+            (json.dumps(block.to_dict(), ensure_ascii=False) + "\n").encode("utf-8")
+        )
+        if data:
+            yield data
+    tail = compressor.flush()
+    if tail:
+        yield tail
+
+
+class NdjsonBlockReader:
+    """
+    Giải nén và tách dòng NDJSON theo từng chunk, đẩy block cho sink theo batch.
+    Bộ nhớ bị chặn kể cả với compression bomb: mỗi lần chỉ giải nén tối đa
+    CHAIN_IMPORT_DECOMPRESS_STEP byte, dòng dài hơn max_line_bytes bị từ chối,
+    và block đã parse được đưa cho sink ngay khi đủ batch_size.
+    """
+
+    def __init__(self, compression, sink, batch_size=CHAIN_IMPORT_BATCH_SIZE,
+                 max_line_bytes=CHAIN_IMPORT_MAX_LINE_BYTES):
+        self.compression = compression
+        self.sink = sink
+        self.batch_size = batch_size
+        self.max_line_bytes = max_line_bytes
+        self.line_no = 0
+        self._buffer = bytearray()
+        self._pending: List[Dict] = []
+
+        if compression == "gzip":
+            self._decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        elif compression == "zstd":
+            if zstandard is None:
+                raise ValueError("zstd compression requires the 'zstandard' package")
+            # stream_writer gọi write() với từng đoạn đã giải nén, mỗi đoạn <= write_size
+            self._decompressor = zstandard.ZstdDecompressor().stream_writer(
+                _LineWriter(self._split_lines),
+                write_size=CHAIN_IMPORT_DECOMPRESS_STEP,
+                closefd=False,
+            )
+        elif compression != "none":
+            raise ValueError(f"Unknown compression: {compression}")
+
+    def feed(self, chunk: bytes):
+        if not chunk:
+            return
+        if self.compression == "gzip":
+            data = chunk
+            while True:
+                out = self._decompressor.decompress(data, CHAIN_IMPORT_DECOMPRESS_STEP)
+                self._split_lines(out)
+                data = self._decompressor.unconsumed_tail
+                # Output đầy có thể còn dữ liệu chờ trong zlib dù input đã hết
+                if not data and len(out) < CHAIN_IMPORT_DECOMPRESS_STEP:
+                    break
+        elif self.compression == "zstd":
+            self._decompressor.write(chunk)
+        else:
+            self._split_lines(chunk)
+
+    def close(self):
+        if self.compression == "gzip":
+            self._split_lines(self._decompressor.flush())
+            if not self._decompressor.eof:
+                raise ValueError("Compressed data is truncated")
+        elif self.compression == "zstd":
+            self._decompressor.flush()
+
+        if self._buffer.strip():
+            self.line_no += 1
+            self._parse_line(bytes(self._buffer))
+        self._buffer = bytearray()
+        if self._pending:
+            batch, self._pending = self._pending, []
+            self.sink(batch)
+
+    def _split_lines(self, data):
+        self._buffer += data
+        if b"\n" in data:
+            lines = self._buffer.split(b"\n")
+            self._buffer = bytearray(lines.pop())
+            for line in lines:
+                self.line_no += 1
+                if line.strip():
+                    self._parse_line(line)
+        if len(self._buffer) > self.max_line_bytes:
+            raise ValueError(f"Line {self.line_no + 1}: longer than {self.max_line_bytes} bytes")
+
+    def _parse_line(self, line):
+        if len(line) > self.max_line_bytes:
+            raise ValueError(f"Line {self.line_no}: longer than {self.max_line_bytes} bytes")
+        try:
+            self._pending.append(json.loads(line))
+        except ValueError:
+            raise ValueError(f"Line {self.line_no}: invalid JSON")
+        if len(self._pending) >= self.batch_size:
+            batch, self._pending = self._pending, []
+            self.sink(batch)
+
+
+class _LineWriter:
+    # Đích ghi cho zstandard stream_writer
+    def __init__(self, write):
+        self._write = write
+
+    def write(self, data):
+        self._write(data)
+        return len(data)
+
+
+class ChainImporter:
+    """
+    Nhập block theo batch. Block chưa có trên chain local phải qua đủ kiểm tra:
+    hash, PoW với difficulty >= CHAIN_IMPORT_MIN_DIFFICULTY, previous_hash,
+    chữ ký và số dư của từng giao dịch (trừ COINBASE).
+    - replace=False: block đã có (cùng index + hash) được bỏ qua, block mới nối vào tip.
+    - replace=True: dựng chain mới từ file; genesis phải trùng genesis local và chain mới
+      phải có tổng công PoW lớn hơn chain hiện tại, chỉ thay chain cũ khi finish().
+    - bootstrap=True (kéo theo replace): nhận genesis của file, dùng để khôi phục backup
+      hoặc seed node mới; chỉ cho phép khi chain local chỉ có genesis của chính node.
+    Mỗi batch giữ write lock của blockchain, nên mine/giao dịch vẫn chen vào được giữa các batch.
+    """
+
+    def __init__(self, blockchain: "Blockchain", replace=False, bootstrap=False):
+        if not blockchain.import_lock.acquire(blocking=False):
+            raise ValueError("Another chain import is in progress")
+        self._locked = True
+
+        self.blockchain = blockchain
+        self.bootstrap = bootstrap
+        self.replace = replace or bootstrap
+        if bootstrap and not self._local_is_genesis_only():
+            self._release()
+            raise ValueError("Bootstrap requires a node whose chain is only its own genesis block")
+        self._new_chain = None
+        if self.replace:
+            # File body riêng cho mỗi lần import: không đụng file mà snapshot cũ còn đang đọc
+            self._new_chain = new_chain_storage(f"{BLOCK_BODIES_FILE}.{uuid.uuid4().hex[:12]}")
+        # Số dư theo chain đang dựng, để kiểm tra giao dịch trong block mới
+        self._balances: Optional[Dict[str, float]] = {} if self.replace else None
+        self.imported = 0
+        self.skipped = 0
+        self.started = time.time()
+
+    def _local_is_genesis_only(self):
+        return len(self.blockchain.chain) == 1
+
+    @property
+    def chain(self):
+        return self._new_chain if self.replace else self.blockchain.chain
+
+    def add_batch(self, block_dicts: List[Dict]):
+        with self.blockchain.write_lock:
+            accepted = self._add_batch(block_dicts)
+            if not self.replace and accepted:
+                self.blockchain.reconcile_mempool(accepted)
+                self.blockchain.publish_snapshot()
+
+    def _add_batch(self, block_dicts: List[Dict]):
+        local = self.blockchain.chain
+        if self._balances is None:
+            self._balances = ChainSnapshot(local, [], [], 0).get_balances()
+
+        accepted = []
+        tip = self.chain[-1] if len(self.chain) else None
+
+        for data in block_dicts:
+            try:
+                block = Block.from_dict(data)
+            except (KeyError, TypeError):
+                raise ValueError("Malformed block: missing required fields")
+
+            expected_index = len(self.chain) + len(accepted)
+            if not self.replace and block.index < expected_index and not accepted:
+                if self.chain[block.index].hash != block.hash:
+                    raise ValueError(f"Block #{block.index}: conflicts with local chain (use replace)")
+                self.skipped += 1
+                continue
+            if block.index != expected_index:
+                raise ValueError(f"Block #{block.index}: expected index {expected_index}")
+            expected_prev = tip.hash if tip is not None else "0" * 64
+            if block.previous_hash != expected_prev:
+                raise ValueError(f"Block #{block.index}: Previous hash mismatch")
+
+            # Replace: block trùng chain local (cùng index + hash) đã được node chấp nhận trước đó
+            trusted = self.replace and block.index < len(local) and local[block.index].hash == block.hash
+            if block.index == 0 and not trusted:
+                if not self.bootstrap:
+                    raise ValueError("Block #0: genesis does not match local chain (use bootstrap)")
+                self._validate_genesis(block)
+            elif not trusted:
+                self._validate_new_block(block)
+
+            for tx in block.transactions:
+                apply_tx_to_balances(self._balances, tx)
+            accepted.append(block)
+            tip = block
+
+        self.chain.extend(accepted)
+        self.imported += len(accepted)
+        return accepted
+
+    @staticmethod
+    def _validate_pow(block: Block):
+        if block.difficulty < CHAIN_IMPORT_MIN_DIFFICULTY:
+            raise ValueError(
+                f"Block #{block.index}: difficulty {block.difficulty} below required {CHAIN_IMPORT_MIN_DIFFICULTY}"
+            )
+        if block.calculate_hash() != block.hash:
+            raise ValueError(f"Block #{block.index}: Hash mismatch")
+        if not block.hash.startswith("0" * block.difficulty):
+            raise ValueError(f"Block #{block.index}: Invalid proof-of-work")
+
+    def _validate_genesis(self, block: Block):
+        self._validate_pow(block)
+        if any(tx["sender"] != "GENESIS" for tx in block.transactions):
+            raise ValueError("Block #0: genesis may only contain GENESIS transactions")
+
+    def _validate_new_block(self, block: Block):
+        self._validate_pow(block)
+
+        # Số dư thay đổi trong block, xét theo thứ tự giao dịch (giống lúc vào mempool)
+        delta: Dict[str, float] = {}
+        for tx in block.transactions:
+            sender = tx["sender"]
+            if sender == "GENESIS":
+                raise ValueError(f"Block #{block.index}: GENESIS transaction outside genesis block")
+            if sender != "COINBASE":
+                if not Blockchain.verify_transaction_signature(tx):
+                    raise ValueError(f"Block #{block.index}: Invalid signature")
+                if self._balances.get(sender, 0.0) + delta.get(sender, 0.0) < tx["amount"]:
+                    raise ValueError(f"Block #{block.index}: Insufficient balance for {sender}")
+            apply_tx_to_balances(delta, tx)
+
+    def stats(self):
+        elapsed = time.time() - self.started
+        return {
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "total_blocks": len(self.chain),
+            "seconds": round(elapsed, 3),
+            "blocks_per_sec": round(self.imported / elapsed, 1) if elapsed > 0 else None,
+        }
+
+    def _release(self):
+        if self._locked:
+            self._locked = False
+            self.blockchain.import_lock.release()
+
+    def finish(self):
+        """Hoàn tất import; nếu raise, caller gọi abort()."""
+        if self.replace:
+            with self.blockchain.write_lock:
+                if self.bootstrap:
+                    # Genesis local bị bỏ, nên không so công PoW; chỉ cần node chưa mine thêm
+                    if not self._local_is_genesis_only():
+                        raise ValueError("Local chain changed during bootstrap")
+                elif chain_work(self.chain) <= chain_work(self.blockchain.chain):
+                    raise ValueError(
+                        f"Imported chain ({len(self.chain)} blocks) does not have more proof-of-work "
+                        f"than local chain ({len(self.blockchain.chain)} blocks)"
+                    )
+                self.blockchain.chain = self.chain
+                self.blockchain.reconcile_mempool()
+                self.blockchain.publish_snapshot()
+        if self.imported or self.replace:
+            self.blockchain.save_to_file()
+        self._release()
+        return self.stats()
+
+    def abort(self):
+        try:
+            if self.replace:
+                if isinstance(self.chain, DiskChain) and os.path.exists(self.chain.path):
+                    os.remove(self.chain.path)
+            elif self.imported:
+                # Các block đã nhập đều hợp lệ, giữ lại
+                self.blockchain.save_to_file()
+        finally:
+            self._release()
 
 
 # =========================
@@ -389,6 +1172,19 @@ FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "../front
 app.mount("/static", StaticFiles(directory=FRONTEND_DIR), name="static")
 
 
+@app.on_event("startup")
+def on_startup():
+    with open(NODE_LOCK_FILE, "w") as f:
+        f.write(str(os.getpid()))
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    shutdown_batch_pool()
+    if os.path.exists(NODE_LOCK_FILE):
+        os.remove(NODE_LOCK_FILE)
+
+
 @app.get("/")
 def root():
     return FileResponse(os.path.join(FRONTEND_DIR, "index.html"))
@@ -406,16 +1202,79 @@ def overview():
     return FileResponse(os.path.join(FRONTEND_DIR, "overview.html"))
 
 
+def _iter_chain_json(chain):
+    # Sinh JSON {"length": n, "chain": [...]} từng block một, không dựng cả response trong RAM
+    yield '{"length": %d, "chain": [' % len(chain)
+    for i, block in enumerate(chain):
+        yield ("," if i else "") + json.dumps(block.to_dict(), ensure_ascii=False)
+    yield "]}"
+
+
 @app.get("/chain")
 def get_chain():
-    return {"length": len(blockchain.chain), "chain": [b.to_dict() for b in blockchain.chain]}
+    return StreamingResponse(_iter_chain_json(blockchain.snapshot().chain), media_type="application/json")
+
+
+@app.get("/chain/export")
+def export_chain(compression: str = "none"):
+    """
+    Export chain dạng NDJSON (mỗi block một dòng), stream từng block.
+    compression: none | gzip | zstd
+    """
+    if compression not in CHAIN_COMPRESSIONS:
+        raise HTTPException(400, f"Compression must be one of {', '.join(CHAIN_COMPRESSIONS)}")
+    try:
+        make_compressor(compression)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    filename = "blockchain.ndjson" + {"none": "", "gzip": ".gz", "zstd": ".zst"}[compression]
+    return StreamingResponse(
+        iter_chain_ndjson(blockchain.snapshot().chain, compression),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@app.post("/chain/import")
+async def import_chain(request: Request, compression: str = "none", replace: bool = False,
+                       bootstrap: bool = False):
+    """
+    Import chain NDJSON (định dạng của /chain/export) từ request body.
+    Đọc body theo chunk, kiểm tra và append theo batch, bộ nhớ không phụ thuộc độ dài chain.
+    bootstrap=true: nhận genesis của file (node mới, chain chỉ có genesis của chính nó).
+    """
+    if compression not in CHAIN_COMPRESSIONS:
+        raise HTTPException(400, f"Compression must be one of {', '.join(CHAIN_COMPRESSIONS)}")
+    try:
+        make_compressor(compression)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    try:
+        importer = ChainImporter(blockchain, replace=replace, bootstrap=bootstrap)
+    except ValueError as e:
+        raise HTTPException(409, str(e))
+
+    try:
+        reader = NdjsonBlockReader(compression, importer.add_batch)
+        async for chunk in request.stream():
+            # Giải nén, parse JSON và add_batch chạy trong thread pool, không chặn event loop
+            await run_in_threadpool(reader.feed, chunk)
+        await run_in_threadpool(reader.close)
+        result = await run_in_threadpool(importer.finish)
+    except Exception as e:
+        await run_in_threadpool(importer.abort)
+        raise HTTPException(400, f"Import error: {e}")
+
+    return {"message": "Chain imported", **result}
 
 
 @app.post("/mine/{miner_address}")
 def mine(miner_address: str):
     block = blockchain.mine_pending_transactions(miner_address)
     if block is None:
-        raise HTTPException(400, "No transactions to mine")
+        raise HTTPException(409, "Chain changed while mining, retry")
     return {"message": "Block mined", "block": block.to_dict()}
 
 
@@ -423,7 +1282,7 @@ def mine(miner_address: str):
 def new_tx(tx: TxModel):
     if not blockchain.add_transaction(tx.dict()):
         raise HTTPException(400, "Invalid TX or insufficient balance")
-    return {"message": "Transaction added", "mempool": len(blockchain.mempool)}
+    return {"message": "Transaction added", "mempool": len(blockchain.snapshot().mempool)}
 
 
 @app.post("/wallet/new")
@@ -458,6 +1317,37 @@ def new_wallet_api(req: WalletCreateRequest = None):
     }
 
 
+@app.post("/wallet/batch")
+def new_wallet_batch_api(count: int, req: WalletCreateRequest = None):
+    """
+    Tạo nhiều ví trong một request (load test / onboarding).
+    Nếu initial_balance > 0, mỗi ví nhận một giao dịch COINBASE trong mempool.
+    """
+    if count < 1 or count > BATCH_MAX_SIZE:
+        raise HTTPException(400, f"Count must be between 1 and {BATCH_MAX_SIZE}")
+
+    initial_balance = req.initial_balance if req else 0
+    wallets = generate_wallets(count)
+
+    if initial_balance > 0:
+        blockchain.add_transactions([{
+            "sender": "COINBASE",
+            "receiver": addr,
+            "amount": float(initial_balance),
+            "signature": "",
+            "public_key": ""
+        } for _, _, addr in wallets])
+
+    return {
+        "count": len(wallets),
+        "initial_balance": initial_balance,
+        "wallets": [
+            {"private_key": priv, "public_key": pub, "address": addr}
+            for priv, pub, addr in wallets
+        ]
+    }
+
+
 @app.get("/balance/{address}")
 def balance(address):
     return {"address": address, "balance": blockchain.get_balance(address)}
@@ -469,8 +1359,9 @@ def balance(address):
 
 @app.get("/stats")
 def stats():
-    total_blocks = len(blockchain.chain)
-    total_txs = sum(len(b.transactions) for b in blockchain.chain)
+    snap = blockchain.snapshot()
+    total_blocks = len(snap.chain)
+    total_txs = sum(len(b.transactions) for b in snap.chain)
 
     return {
         "total_blocks": total_blocks,
@@ -480,23 +1371,13 @@ def stats():
 
 @app.get("/accounts")
 def accounts():
-    addresses = set()
-
-    for block in blockchain.chain:
-        for tx in block.transactions:
-            addresses.add(tx["sender"])
-            addresses.add(tx["receiver"])
-
-    for tx in blockchain.mempool:
-        addresses.add(tx["sender"])
-        addresses.add(tx["receiver"])
-
-    addresses.discard("GENESIS")
+    balances = blockchain.get_balances()
+    balances.pop("GENESIS", None)
 
     return {
         "accounts": [
-            {"address": a, "balance": blockchain.get_balance(a)}
-            for a in addresses
+            {"address": a, "balance": b}
+            for a, b in balances.items()
         ]
     }
 
@@ -505,7 +1386,7 @@ def accounts():
 def coinbase():
     rewards = []
 
-    for block in blockchain.chain:
+    for block in blockchain.snapshot().chain:
         for tx in block.transactions:
             if tx["sender"] == "COINBASE":
                 rewards.append({
@@ -519,12 +1400,12 @@ def coinbase():
 
 @app.get("/txlog")
 def get_tx_log():
-    return {"txlog": blockchain.tx_log}
+    return {"txlog": list(blockchain.snapshot().tx_log)}
 
 @app.get("/difficulty")
 def get_difficulty():
     return {
-        "current_difficulty": blockchain.current_difficulty,
+        "current_difficulty": blockchain.snapshot().current_difficulty,
         "initial_difficulty": INITIAL_DIFFICULTY
     }
 
@@ -532,10 +1413,10 @@ def get_difficulty():
 def update_difficulty(new_difficulty: int):
     if new_difficulty < 1 or new_difficulty > 10:
         raise HTTPException(400, "Difficulty must be between 1 and 10")
-    blockchain.current_difficulty = new_difficulty
+    blockchain.set_difficulty(new_difficulty)
     return {
         "message": "Difficulty updated",
-        "new_difficulty": blockchain.current_difficulty
+        "new_difficulty": new_difficulty
     }
 
 @app.get("/reward")
@@ -574,18 +1455,13 @@ def sign_api(req: SignRequest):
     """
     try:
         # Dùng lại logic sign_transaction để đảm bảo giống hệt
-        sig = sign_transaction(
+        sig, pub_key = sign_with_public_key(
             req.private_key,
             req.sender,
             req.receiver,
             req.amount
         )
 
-        # Lấy public key từ private key
-        sk = SigningKey.from_string(bytes.fromhex(req.private_key), curve=SECP256k1)
-        vk = sk.get_verifying_key()
-        pub_key = vk.to_string().hex()
-
         return {
             "signature": sig,
             "public_key": pub_key
@@ -593,6 +1469,40 @@ def sign_api(req: SignRequest):
     except Exception as e:
         raise HTTPException(400, f"Sign error: {e}")
 
+@app.post("/sign/batch")
+def sign_batch_api(req: SignBatchRequest):
+    """
+    Ký nhiều giao dịch (DEMO). Lỗi của từng giao dịch được trả về riêng,
+    không làm hỏng cả batch. Với submit=true, các giao dịch ký thành công
+    được đưa vào mempool trong một lần.
+    """
+    if len(req.transactions) < 1 or len(req.transactions) > BATCH_MAX_SIZE:
+        raise HTTPException(400, f"Batch size must be between 1 and {BATCH_MAX_SIZE}")
+
+    results = sign_transactions([
+        (t.private_key, t.sender, t.receiver, t.amount) for t in req.transactions
+    ])
+
+    if req.submit:
+        signed = [i for i, r in enumerate(results) if "error" not in r]
+        admitted = blockchain.add_transactions([{
+            "sender": req.transactions[i].sender,
+            "receiver": req.transactions[i].receiver,
+            "amount": req.transactions[i].amount,
+            "signature": results[i]["signature"],
+            "public_key": results[i]["public_key"],
+        } for i in signed])
+        for i, ok in zip(signed, admitted):
+            results[i]["submitted"] = ok
+
+    return {
+        "count": len(results),
+        "signed": sum(1 for r in results if "error" not in r),
+        "submitted": sum(1 for r in results if r.get("submitted")),
+        "mempool": len(blockchain.snapshot().mempool),
+        "results": results
+    }
+
 @app.get("/validate")
 def validate_chain():
     """
@@ -0,0 +1,125 @@
+"""
+Export / import blockchain dạng NDJSON (mỗi block một dòng) từ dòng lệnh.
+Chạy trong thư mục backend/ (dùng chung blockchain_data.json với node).
+
+    python chain_transfer.py export chain.ndjson.gz
+    python chain_transfer.py import chain.ndjson.gz --replace
+    python chain_transfer.py import backup.ndjson.gz --bootstrap   # node mới / khôi phục backup
+
+--bootstrap nhận genesis của file thay cho genesis ngẫu nhiên mà node chưa có dữ liệu tự tạo;
+chỉ chạy được khi chain local chỉ có genesis.
+
+Compression được suy ra từ đuôi file (.gz -> gzip, .zst -> zstd) nếu không truyền --compression.
+
+Phải dừng node trước khi chạy: CLI đọc/ghi cùng blockchain_data.json và file body với node,
+lần lưu kế tiếp của node sẽ ghi đè kết quả import. Khi node chạy (có file lock), CLI từ chối;
+dùng --force nếu file lock còn sót lại sau khi node bị tắt đột ngột.
+Khi node đang chạy, dùng GET /chain/export và POST /chain/import thay cho CLI.
+"""
+import argparse
+import os
+import sys
+
+# Giống NODE_LOCK_FILE trong blockchain_app; kiểm tra trước khi import module đó,
+# vì import sẽ load (và có thể migrate) file dữ liệu của node
+NODE_LOCK_FILE = "blockchain_node.lock"
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def guess_compression(path):
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def export_chain(node, path, compression):
+    snap = node.blockchain.snapshot()
+    written = 0
+    with open(path, "wb") as f:
+        for data in node.iter_chain_ndjson(snap.chain, compression):
+            f.write(data)
+            written += len(data)
+    print(f"Exported {len(snap.chain)} blocks to {path} ({written} bytes, {compression})")
+
+
+def import_chain(node, path, compression, replace, bootstrap, batch_size):
+    try:
+        importer = node.ChainImporter(node.blockchain, replace=replace, bootstrap=bootstrap)
+    except ValueError as e:
+        print(f"Import error: {e}")
+        return 1
+
+    def add_batch(blocks):
+        importer.add_batch(blocks)
+        stats = importer.stats()
+        print(f"  {stats['imported']} blocks ({stats['blocks_per_sec']} blocks/sec)")
+
+    try:
+        reader = node.NdjsonBlockReader(compression, add_batch, batch_size)
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK_SIZE), b""):
+                reader.feed(chunk)
+        reader.close()
+        stats = importer.finish()
+    except Exception as e:
+        importer.abort()
+        print(f"Import error: {e}")
+        return 1
+
+    print(
+        f"Imported {stats['imported']} blocks, skipped {stats['skipped']}, "
+        f"chain length {stats['total_blocks']} in {stats['seconds']}s "
+        f"({stats['blocks_per_sec']} blocks/sec)"
+    )
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export/import blockchain NDJSON (node phải đang dừng)")
+    parser.add_argument("--force", action="store_true", help="Bỏ qua file lock của node (lock cũ còn sót)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export", help="Ghi chain ra file NDJSON")
+    p_export.add_argument("path")
+    p_export.add_argument("--compression", help="none | gzip | zstd")
+
+    p_import = sub.add_parser("import", help="Nạp chain từ file NDJSON")
+    p_import.add_argument("path")
+    p_import.add_argument("--compression", help="none | gzip | zstd")
+    p_import.add_argument("--replace", action="store_true", help="Thay toàn bộ chain hiện tại")
+    p_import.add_argument(
+        "--bootstrap", action="store_true",
+        help="Nhận genesis của file (node chưa có dữ liệu hoặc chỉ có genesis); kéo theo --replace",
+    )
+    p_import.add_argument("--batch-size", type=int)
+
+    args = parser.parse_args(argv)
+
+    if os.path.exists(NODE_LOCK_FILE) and not args.force:
+        print(
+            f"Node appears to be running ({NODE_LOCK_FILE} exists). Stop the node first, "
+            "or use /chain/export and /chain/import. Pass --force if the lock is stale."
+        )
+        return 1
+
+    import blockchain_app as node
+
+    compression = args.compression or guess_compression(args.path)
+    try:
+        node.make_compressor(compression)
+    except ValueError as e:
+        print(e)
+        return 1
+
+    if args.command == "export":
+        export_chain(node, args.path, compression)
+        return 0
+    batch_size = args.batch_size or node.CHAIN_IMPORT_BATCH_SIZE
+    return import_chain(node, args.path, compression, args.replace, args.bootstrap, batch_size)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Test ChainImporter: kiểm tra block khi import, replace/bootstrap, round trip export -> import.
+
+    cd backend && pytest test_chain_import.py
+"""
+import os
+import time
+from glob import glob
+
+import pytest
+
+import blockchain_app
+from blockchain_app import (
+    Block,
+    Blockchain,
+    ChainImporter,
+    NdjsonBlockReader,
+    generate_wallet,
+    iter_chain_ndjson,
+    sign_with_public_key,
+)
+
+FUNDING = 50.0
+
+
+@pytest.fixture(params=[False, True], ids=["memory", "pruned"])
+def node(request, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(blockchain_app, "PRUNED_MODE", request.param)
+    monkeypatch.setattr(blockchain_app, "INITIAL_DIFFICULTY", 1)
+    return tmp_path
+
+
+def coinbase(receiver, amount):
+    return {"sender": "COINBASE", "receiver": receiver, "amount": amount, "signature": "", "public_key": ""}
+
+
+def transfer(wallet, receiver, amount):
+    private_key, _, sender = wallet
+    sig, pub = sign_with_public_key(private_key, sender, receiver, amount)
+    return {"sender": sender, "receiver": receiver, "amount": amount, "signature": sig, "public_key": pub}
+
+
+def next_block(tip, txs, difficulty=1, mine=True):
+    block = Block(tip.index + 1, time.time(), txs, tip.hash, difficulty)
+    if mine:
+        block.mine_block()
+    return block
+
+
+def funded_chain():
+    """Chain local: genesis + một block cấp FUNDING cho ví trả về."""
+    bc = Blockchain()
+    wallet = generate_wallet()
+    assert bc.add_transaction(coinbase(wallet[2], FUNDING))
+    assert bc.mine_pending_transactions("miner") is not None
+    return bc, wallet
+
+
+def run_import(bc, blocks, compression="none", **kwargs):
+    data = b"".join(iter_chain_ndjson(blocks, compression))
+    importer = ChainImporter(bc, **kwargs)
+    try:
+        reader = NdjsonBlockReader(compression, importer.add_batch, batch_size=2)
+        reader.feed(data)
+        reader.close()
+        return importer.finish()
+    except Exception:
+        importer.abort()
+        raise
+
+
+def test_difficulty_zero_block_minting_coins_is_rejected(node):
+    bc, _ = funded_chain()
+    forged = next_block(bc.chain[-1], [coinbase("attacker", 1e9)], difficulty=0, mine=False)
+
+    with pytest.raises(ValueError, match="difficulty 0 below required"):
+        run_import(bc, list(bc.chain) + [forged])
+    assert bc.get_balance("attacker") == 0.0
+    assert len(bc.chain) == 2
+
+
+def test_bad_signature_is_rejected(node):
+    bc, wallet = funded_chain()
+    tx = transfer(wallet, "bob", 10.0)
+    tx["amount"] = 40.0  # Chữ ký không còn khớp
+
+    with pytest.raises(ValueError, match="Invalid signature"):
+        run_import(bc, list(bc.chain) + [next_block(bc.chain[-1], [tx])])
+    assert len(bc.chain) == 2
+
+
+def test_overspend_is_rejected(node):
+    bc, wallet = funded_chain()
+    # Từng giao dịch đủ số dư, nhưng cộng lại trong cùng block thì vượt
+    txs = [transfer(wallet, "bob", 30.0), transfer(wallet, "carol", 30.0)]
+
+    with pytest.raises(ValueError, match="Insufficient balance"):
+        run_import(bc, list(bc.chain) + [next_block(bc.chain[-1], txs)])
+    assert bc.get_balance(wallet[2]) == FUNDING
+
+
+def test_replace_with_shorter_chain_is_rejected_and_cleaned_up(node):
+    bc, _ = funded_chain()
+    shorter = list(bc.chain)
+    assert bc.mine_pending_transactions("miner") is not None
+    before = [b.hash for b in bc.chain]
+
+    with pytest.raises(ValueError, match="does not have more proof-of-work"):
+        run_import(bc, shorter, replace=True)
+    assert [b.hash for b in bc.chain] == before
+    # File body tạm của lần replace bị xóa
+    assert glob(blockchain_app.BLOCK_BODIES_FILE + ".*") == []
+
+
+def test_gzip_round_trip_bootstraps_fresh_node(node, monkeypatch):
+    bc, wallet = funded_chain()
+    assert bc.add_transaction(transfer(wallet, "bob", 20.0))
+    assert bc.mine_pending_transactions("miner") is not None
+    exported = b"".join(iter_chain_ndjson(bc.snapshot().chain, "gzip"))
+
+    fresh_dir = node / "fresh"
+    fresh_dir.mkdir()
+    monkeypatch.chdir(fresh_dir)
+    fresh = Blockchain()
+
+    # Genesis của node mới khác genesis của file: cần bootstrap
+    with pytest.raises(ValueError, match="genesis does not match"):
+        run_import(fresh, list(bc.chain), "gzip", replace=True)
+
+    importer = ChainImporter(fresh, bootstrap=True)
+    reader = NdjsonBlockReader("gzip", importer.add_batch, batch_size=2)
+    for i in range(0, len(exported), 16):
+        reader.feed(exported[i:i + 16])
+    reader.close()
+    stats = importer.finish()
+
+    assert stats["imported"] == len(bc.chain)
+    assert [b.to_dict() for b in fresh.chain] == [b.to_dict() for b in bc.chain]
+    assert fresh.get_balances() == bc.get_balances()
+    assert fresh.is_chain_valid()["valid"]
+    assert os.path.exists(blockchain_app.BLOCKCHAIN_DATA_FILE)
+
+    # Node đã có block ngoài genesis thì không bootstrap được nữa
+    with pytest.raises(ValueError, match="Bootstrap requires"):
+        ChainImporter(fresh, bootstrap=True)
+
+
+def test_mempool_is_reconciled_after_append_import(node):
+    bc, wallet = funded_chain()
+    included = transfer(wallet, "bob", 10.0)
+    stale = transfer(wallet, "carol", 30.0)
+    assert bc.add_transactions([included, stale]) == [True, True]
+
+    # Block từ peer: chứa `included` và một khoản chi khác làm `stale` hết số dư
+    peer_block = next_block(bc.chain[-1], [included, transfer(wallet, "dave", 25.0)])
+    stats = run_import(bc, list(bc.chain) + [peer_block])
+
+    assert stats["imported"] == 1
+    assert stats["skipped"] == 2
+    assert len(bc.snapshot().mempool) == 0
+    assert bc.get_balance(wallet[2]) == FUNDING - 35.0
+    assert bc.snapshot().tx_log[-1]["reason"] == "Dropped from mempool after chain import"
@@ -0,0 +1,148 @@
+"""
+Stress test đồng thời cho Blockchain: nhiều thread ký + gửi giao dịch, mine và đọc snapshot cùng lúc.
+
+    cd backend && pytest test_concurrency.py
+"""
+import random
+import threading
+import time
+
+import pytest
+
+import blockchain_app
+from blockchain_app import Blockchain, _tx_key, generate_wallet, sign_with_public_key
+
+WALLETS = 6
+WRITERS_PER_WALLET = 2  # Nhiều thread cùng chi từ một ví: tranh chấp số dư thật sự
+TRANSFERS_PER_WRITER = 20
+MINERS = 2
+READERS = 3
+FUNDING = 50.0
+GENESIS_SUPPLY = 1000.0
+
+
+@pytest.fixture(params=[False, True], ids=["memory", "pruned"])
+def chain(request, tmp_path, monkeypatch):
+    # File dữ liệu nằm trong tmp_path; reward = 0 để tổng cung không đổi sau khi cấp vốn
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(blockchain_app, "PRUNED_MODE", request.param)
+    monkeypatch.setattr(blockchain_app, "INITIAL_DIFFICULTY", 1)
+    monkeypatch.setattr(blockchain_app, "BLOCK_REWARD_MIN", 0)
+    monkeypatch.setattr(blockchain_app, "BLOCK_REWARD_MAX", 0)
+    return Blockchain()
+
+
+def check_invariants(snap, expected_supply):
+    balances = snap.get_balances()
+    supply = sum(b for a, b in balances.items() if a not in ("COINBASE", "GENESIS"))
+    assert supply == expected_supply, f"supply {supply} != {expected_supply}"
+
+    negative = {a: b for a, b in balances.items() if b < 0}
+    assert not negative, f"negative balances: {negative}"
+
+    chain_keys = {_tx_key(tx) for block in snap.chain for tx in block.transactions}
+    duplicated = [tx for tx in snap.mempool if _tx_key(tx) in chain_keys]
+    assert not duplicated, f"transactions in both chain and mempool: {duplicated}"
+
+    result = snap.is_chain_valid()
+    assert result["valid"], result["errors"]
+
+
+def test_concurrent_writers_miners_and_readers(chain, monkeypatch):
+    wallets = [generate_wallet() for _ in range(WALLETS)]
+    funded = chain.add_transactions([{
+        "sender": "COINBASE",
+        "receiver": addr,
+        "amount": FUNDING,
+        "signature": "",
+        "public_key": "",
+    } for _, _, addr in wallets])
+    assert all(funded)
+    assert chain.mine_pending_transactions("miner") is not None
+
+    expected_supply = GENESIS_SUPPLY + FUNDING * WALLETS
+    check_invariants(chain.snapshot(), expected_supply)
+
+    errors = []
+    writers_done = threading.Event()
+
+    # Ngoài reader chạy song song, kiểm tra luôn mọi snapshot được publish:
+    # cửa sổ lỗi giữa hai lần publish quá ngắn để reader bắt được một cách ổn định
+    publish = Blockchain.publish_snapshot
+
+    def checked_publish(self):
+        publish(self)
+        check_invariants(self.snapshot(), expected_supply)
+
+    monkeypatch.setattr(Blockchain, "publish_snapshot", checked_publish)
+
+    def record_errors(fn):
+        def run(*args):
+            try:
+                fn(*args)
+            except BaseException as e:  # noqa: B902 - lỗi trong thread phải được báo về test
+                errors.append(e)
+        return run
+
+    @record_errors
+    def writer(k):
+        rng = random.Random(k)
+        private_key, _, sender = wallets[k % WALLETS]
+        for j in range(TRANSFERS_PER_WRITER):
+            # Nửa số giao dịch gửi ra ngoài các ví để ví thật sự cạn dần
+            receiver = wallets[(k + 1) % WALLETS][2] if j % 2 else "outside"
+            # Thỉnh thoảng gửi quá số dư: phải bị từ chối, không làm âm số dư.
+            # Tổng các khoản nhỏ vượt FUNDING nên ví sẽ cạn trong lúc các thread cùng chi
+            amount = 1000.0 if j % 7 == 0 else float(rng.randint(2, 8))
+            sig, pub = sign_with_public_key(private_key, sender, receiver, amount)
+            tx = {"sender": sender, "receiver": receiver, "amount": amount,
+                  "signature": sig, "public_key": pub}
+            if j % 2:
+                chain.add_transaction(tx)
+            else:
+                chain.add_transactions([tx, dict(tx)])  # bản trùng bị kiểm tra số dư lần nữa
+
+    @record_errors
+    def miner():
+        while not writers_done.is_set():
+            # Chỉ mine khi có giao dịch chờ, tránh chain phình ra toàn block rỗng
+            if len(chain.snapshot().mempool):
+                chain.mine_pending_transactions("miner")
+            else:
+                time.sleep(0.001)
+
+    @record_errors
+    def reader():
+        while not writers_done.is_set():
+            check_invariants(chain.snapshot(), expected_supply)
+
+    writers = [threading.Thread(target=writer, args=(k,)) for k in range(WALLETS * WRITERS_PER_WALLET)]
+    others = (
+        [threading.Thread(target=miner) for _ in range(MINERS)]
+        + [threading.Thread(target=reader) for _ in range(READERS)]
+    )
+    for t in writers + others:
+        t.start()
+    for t in writers:
+        t.join()
+    writers_done.set()
+    for t in others:
+        t.join()
+
+    assert not errors, errors
+
+    # Không còn ai ghi: mine phần còn lại, mọi giao dịch được nhận phải nằm trong chain đúng một lần
+    assert chain.mine_pending_transactions("miner") is not None
+    snap = chain.snapshot()
+    check_invariants(snap, expected_supply)
+    assert len(snap.mempool) == 0
+
+    admitted = [
+        _tx_key(entry["tx"]) for entry in snap.tx_log
+        if entry["status"] == "SUCCESS" and entry["tx"]["sender"] != "COINBASE"
+    ]
+    in_chain = [
+        _tx_key(tx) for block in snap.chain for tx in block.transactions
+        if tx["sender"] not in ("COINBASE", "GENESIS")
+    ]
+    assert sorted(admitted) == sorted(in_chain)
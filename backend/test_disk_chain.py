@@ -0,0 +1,139 @@
+"""
+Test DiskChain (pruned mode): LRU cache theo byte, lỗi file body, migrate định dạng cũ, giới hạn tx_log.
+
+    cd backend && pytest test_disk_chain.py
+"""
+import json
+import os
+
+import pytest
+
+import blockchain_app
+from blockchain_app import Block, Blockchain, BlockStorageError, DiskChain
+
+
+def make_blocks(n, tx_per_block=1):
+    blocks = []
+    previous_hash = "0" * 64
+    for i in range(n):
+        txs = [{
+            "sender": "COINBASE",
+            "receiver": f"addr{i}-{j}",
+            "amount": 1.0,
+            "signature": "",
+            "public_key": "",
+        } for j in range(tx_per_block)]
+        block = Block(i, 1000.0 + i, txs, previous_hash, 1)
+        blocks.append(block)
+        previous_hash = block.hash
+    return blocks
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(blockchain_app, "INITIAL_DIFFICULTY", 1)
+    return tmp_path
+
+
+def test_cache_evicts_least_recently_used_by_bytes(tmp_path):
+    path = str(tmp_path / "bodies.ndjson")
+    blocks = make_blocks(4)
+    body_size = len(json.dumps(blocks[0].transactions) + "\n")
+    chain = DiskChain(path=path, reset=True, cache_max_bytes=body_size * 2)
+
+    chain.extend(blocks)
+    assert list(chain._cache) == [2, 3]
+    assert chain._cache_bytes <= chain.cache_max_bytes
+
+    # Đọc lại block đã bị đẩy ra: lấy từ đĩa, thành block mới dùng gần nhất
+    assert chain[0].hash == blocks[0].hash
+    assert list(chain._cache) == [3, 0]
+
+    # Duyệt tuần tự không làm trôi cache
+    assert [b.hash for b in chain] == [b.hash for b in blocks]
+    assert list(chain._cache) == [3, 0]
+
+
+def test_block_larger_than_cache_is_not_cached(tmp_path):
+    chain = DiskChain(path=str(tmp_path / "bodies.ndjson"), reset=True, cache_max_bytes=10)
+    big = make_blocks(1, tx_per_block=5)[0]
+
+    chain.append(big)
+    assert not chain._cache
+    assert chain[0].to_dict() == big.to_dict()
+
+
+def test_missing_or_truncated_bodies_file_raises(tmp_path):
+    path = str(tmp_path / "bodies.ndjson")
+    chain = DiskChain(path=path, reset=True)
+    chain.extend(make_blocks(3))
+    headers = chain.header_dicts()
+
+    assert len(DiskChain(path=path, headers=headers)) == 3
+
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 1)
+    with pytest.raises(BlockStorageError, match="truncated"):
+        DiskChain(path=path, headers=headers)
+
+    os.remove(path)
+    with pytest.raises(BlockStorageError, match="not found"):
+        DiskChain(path=path, headers=headers)
+    assert not os.path.exists(path)
+
+
+def test_load_does_not_replace_chain_when_bodies_are_missing(data_dir, monkeypatch):
+    monkeypatch.setattr(blockchain_app, "PRUNED_MODE", True)
+    bc = Blockchain()
+    assert bc.mine_pending_transactions("miner") is not None
+    with open(blockchain_app.BLOCKCHAIN_DATA_FILE, encoding="utf-8") as f:
+        saved = f.read()
+
+    os.remove(blockchain_app.BLOCK_BODIES_FILE)
+    with pytest.raises(BlockStorageError):
+        Blockchain()
+    with open(blockchain_app.BLOCKCHAIN_DATA_FILE, encoding="utf-8") as f:
+        assert f.read() == saved
+
+
+def test_migrates_full_format_file_to_pruned(data_dir, monkeypatch):
+    monkeypatch.setattr(blockchain_app, "PRUNED_MODE", False)
+    full = Blockchain()
+    for _ in range(3):
+        assert full.mine_pending_transactions("miner") is not None
+    expected = [b.to_dict() for b in full.chain]
+
+    monkeypatch.setattr(blockchain_app, "PRUNED_MODE", True)
+    pruned = Blockchain()
+    assert isinstance(pruned.chain, DiskChain)
+    assert [b.to_dict() for b in pruned.chain] == expected
+
+    pruned.save_to_file()
+    with open(blockchain_app.BLOCKCHAIN_DATA_FILE, encoding="utf-8") as f:
+        data = json.load(f)
+    assert "chain" not in data
+    assert len(data["headers"]) == len(expected)
+
+    reloaded = Blockchain()
+    assert [b.to_dict() for b in reloaded.chain] == expected
+    assert reloaded.is_chain_valid()["valid"]
+
+
+def test_tx_log_is_bounded_in_pruned_mode(data_dir, monkeypatch):
+    monkeypatch.setattr(blockchain_app, "PRUNED_MODE", True)
+    monkeypatch.setattr(blockchain_app, "TX_LOG_MAX_ENTRIES", 5)
+    bc = Blockchain()
+    bad_tx = {"sender": "a", "receiver": "b", "amount": 1.0, "signature": "", "public_key": ""}
+
+    bc.add_transactions([dict(bad_tx, amount=float(i)) for i in range(3)])
+    old = bc.snapshot()
+    bc.add_transactions([dict(bad_tx, amount=float(i)) for i in range(3, 8)])
+
+    assert [e["tx"]["amount"] for e in bc.snapshot().tx_log] == [3.0, 4.0, 5.0, 6.0, 7.0]
+    assert [e["tx"]["amount"] for e in old.tx_log] == [0.0, 1.0, 2.0]
+
+    # add_transactions không lưu khi mọi giao dịch bị từ chối
+    bc.save_to_file()
+    with open(blockchain_app.BLOCKCHAIN_DATA_FILE, encoding="utf-8") as f:
+        assert len(json.load(f)["tx_log"]) == 5
@@ -0,0 +1,65 @@
+"""
+Ví và ký giao dịch (SECP256k1).
+
+Module này không có side effect khi import (không tạo Blockchain, không mount app),
+nên worker của process pool (spawn / forkserver) chỉ cần import module này.
+"""
+import hashlib
+import json
+
+from ecdsa import SigningKey, SECP256k1
+
+
+def generate_wallet():
+    sk = SigningKey.generate(curve=SECP256k1)
+    vk = sk.get_verifying_key()
+    private_key = sk.to_string().hex()
+    public_key = vk.to_string().hex()
+    addr = hashlib.sha256(bytes.fromhex(public_key)).hexdigest()[:40]
+    return private_key, public_key, addr
+
+
+def load_signing_key(private_key: str) -> SigningKey:
+    return SigningKey.from_string(bytes.fromhex(private_key), curve=SECP256k1)
+
+
+def sign_transaction(private_key, sender, receiver, amount):
+    return _sign_with_key(load_signing_key(private_key), sender, receiver, amount)[0]
+
+
+def sign_with_public_key(private_key, sender, receiver, amount):
+    """Ký giao dịch và trả về (signature, public_key) từ cùng một SigningKey."""
+    return _sign_with_key(load_signing_key(private_key), sender, receiver, amount)
+
+
+def _sign_with_key(sk: SigningKey, sender, receiver, amount):
+    msg = json.dumps({
+        "sender": sender,
+        "receiver": receiver,
+        "amount": amount
+    }, sort_keys=True).encode()
+
+    sig = sk.sign(msg, hashfunc=hashlib.sha256)
+    return sig.hex(), sk.get_verifying_key().to_string().hex()
+
+
+# Chạy trong worker của process pool
+def generate_wallets_chunk(count):
+    return [generate_wallet() for _ in range(count)]
+
+
+def sign_chunk(items):
+    # Mỗi item: (private_key, sender, receiver, amount)
+    # SigningKey chỉ được tái sử dụng trong batch này, không giữ lại sau khi trả kết quả
+    keys = {}
+    results = []
+    for private_key, sender, receiver, amount in items:
+        try:
+            sk = keys.get(private_key)
+            if sk is None:
+                sk = keys[private_key] = load_signing_key(private_key)
+            sig, pub_key = _sign_with_key(sk, sender, receiver, amount)
+            results.append({"signature": sig, "public_key": pub_key})
+        except Exception as e:
+            results.append({"error": f"Sign error: {e}"})
+    return results